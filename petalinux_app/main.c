@@ -12,6 +12,8 @@
  * CameraLink(PL) → VPSS(YUV422→RGB) → VDMA → DDR(RGBA) → 应用程序 → UVC(RGBA) → PC
  */
 
+#define _GNU_SOURCE  /* sched_setaffinity / CPU_SET */
+
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
@@ -22,6 +24,8 @@
 #include <linux/videodev2.h>
 #include <errno.h>
 #include <time.h>
+#include <sched.h>
+#include <poll.h>
 
 #include "vpss_control.h"
 #include "vdma_control.h"
@@ -43,6 +47,10 @@
 #define TARGET_FPS      60
 #define FRAME_INTERVAL_US  (1000000 / TARGET_FPS)
 
+/* 实时调度参数：主循环绑定的CPU核和SCHED_FIFO优先级 */
+#define STREAM_CPU          1
+#define STREAM_RT_PRIORITY  20
+
 /* 全局变量 */
 static vpss_control_t vpss;
 static vdma_control_t vdma;
@@ -104,6 +112,97 @@ int uvc_init(const char *device)
     return 0;
 }
 
+/**
+ * 设置主循环的实时调度
+ * 
+ * 将主循环绑定到固定CPU核并使用SCHED_FIFO调度，
+ * 避免被其他进程抢占或在核间迁移造成的发送抖动。
+ * 需要root或CAP_SYS_NICE权限，失败时仅打印警告，继续以普通调度运行。
+ */
+static void stream_set_realtime(void)
+{
+    cpu_set_t cpuset;
+    struct sched_param param;
+    
+    CPU_ZERO(&cpuset);
+    CPU_SET(STREAM_CPU, &cpuset);
+    if (sched_setaffinity(0, sizeof(cpuset), &cpuset) < 0) {
+        fprintf(stderr, "警告: 绑定CPU%d失败: %s\n", STREAM_CPU, strerror(errno));
+    } else {
+        printf("主循环已绑定到CPU%d\n", STREAM_CPU);
+    }
+    
+    memset(&param, 0, sizeof(param));
+    param.sched_priority = STREAM_RT_PRIORITY;
+    if (sched_setscheduler(0, SCHED_FIFO, &param) < 0) {
+        fprintf(stderr, "警告: 设置SCHED_FIFO失败: %s\n", strerror(errno));
+        fprintf(stderr, "提示: 需要root或CAP_SYS_NICE权限\n");
+    } else {
+        printf("主循环调度策略: SCHED_FIFO (优先级 %d)\n", STREAM_RT_PRIORITY);
+    }
+}
+
+/**
+ * 将一整帧RGBA数据写入UVC设备
+ * 
+ * 非阻塞write()可能只写入部分数据，此时按偏移量继续写入剩余部分，
+ * 保证提交给UVC的始终是完整的一帧，而不是把半帧当作一帧计数。
+ * 
+ * @param frame 帧数据起始地址
+ * @param size 帧大小（字节）
+ * @return 0成功，1设备忙（本帧未写入，可跳过），-1失败
+ */
+static int uvc_write_frame(const uint8_t *frame, size_t size)
+{
+    size_t offset = 0;
+    
+    while (offset < size) {
+        ssize_t written = write(uvc_fd, frame + offset, size - offset);
+        if (written > 0) {
+            offset += written;
+            continue;
+        }
+        
+        if (written < 0) {
+            if (errno == EINTR) {
+                continue;
+            }
+            if (errno != EAGAIN && errno != EWOULDBLOCK) {
+                perror("写入UVC设备失败");
+                return -1;
+            }
+        }
+        
+        /* 设备暂不可写（EAGAIN或写入0字节） */
+        
+        /* 尚未写入任何数据：直接跳过本帧 */
+        if (offset == 0) {
+            return 1;
+        }
+        /* 已写入部分数据：必须写完剩余部分 */
+        if (!running) {
+            return -1;
+        }
+        
+        /* 等待UVC设备可写，而不是立即重试write()；
+         * 超时（一帧时间）后重新检查running */
+        struct pollfd pfd = { .fd = uvc_fd, .events = POLLOUT };
+        if (poll(&pfd, 1, FRAME_INTERVAL_US / 1000) < 0 && errno != EINTR) {
+            perror("等待UVC设备可写失败");
+            return -1;
+        }
+        
+        /* 设备出错或主机停止取流时poll会立即返回，
+         * 不能再重试write()，否则会在SCHED_FIFO下空转 */
+        if (pfd.revents & (POLLERR | POLLHUP | POLLNVAL)) {
+            fprintf(stderr, "UVC设备异常 (revents=0x%x)，停止写入\n", pfd.revents);
+            return -1;
+        }
+    }
+    
+    return 0;
+}
+
 /**
  * 主循环：读取帧并发送到UVC
  */
@@ -138,16 +237,13 @@ int main_loop()
         const uint8_t *rgba_frame = (uint8_t*)vdma.frame_buffer + (read_frame * FRAME_SIZE);
         
         /* 直接发送RGBA数据到UVC设备 */
-        ssize_t written = write(uvc_fd, rgba_frame, FRAME_SIZE);
-        if (written < 0) {
-            if (errno == EAGAIN || errno == EWOULDBLOCK) {
-                /* 非阻塞写入，缓冲区满，稍后重试 */
-                usleep(1000);
-                continue;
-            } else {
-                perror("写入UVC设备失败");
-                break;
-            }
+        int ret = uvc_write_frame(rgba_frame, FRAME_SIZE);
+        if (ret > 0) {
+            /* 非阻塞写入，缓冲区满，稍后重试 */
+            usleep(1000);
+            continue;
+        } else if (ret < 0) {
+            break;
         }
         
         frame_count++;
@@ -238,6 +334,7 @@ int main(int argc, char **argv)
     }
     
     /* 主循环 */
+    stream_set_realtime();
     ret = main_loop();
     
 cleanup: